@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Callable, Dict, Any, Iterator, Optional, Tuple, Type
 import requests
-from dotenv import load_dotenv
+import asyncio
+import logging
 import os
-from groq import Groq
-from openai import OpenAI
+import httpx
+from groq import Groq, AsyncGroq
+from openai import OpenAI, AsyncOpenAI
+from cache import LLMCache
 
 
 class APIConnection(ABC):
@@ -32,6 +35,48 @@ class APIConnection(ABC):
         """
         pass
 
+    @abstractmethod
+    def stream_request(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """
+        Envia uma requisição para a API recebendo a resposta em partes.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+            **kwargs: Argumentos adicionais específicos da API
+
+        Yields:
+            str: Trechos do texto gerado, na ordem em que chegam
+        """
+        pass
+
+    @abstractmethod
+    def astream_request(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Envia uma requisição para a API de forma assíncrona recebendo a resposta em partes.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+            **kwargs: Argumentos adicionais específicos da API
+
+        Yields:
+            str: Trechos do texto gerado, na ordem em que chegam
+        """
+        pass
+
+    @abstractmethod
+    async def asend_request(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Envia uma requisição para a API de forma assíncrona.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+            **kwargs: Argumentos adicionais específicos da API
+
+        Returns:
+            Dict[str, Any]: Resposta da API em formato de dicionário
+        """
+        pass
+
     @abstractmethod
     def get_response(self, response: Dict[str, Any]) -> str:
         """
@@ -51,16 +96,64 @@ class BaseAPIConnection(APIConnection):
     Classe base que contém a lógica comum para enviar requisições a APIs.
     """
 
-    def __init__(self, api_key: str, model: str) -> None:
+    def __init__(self, api_key: str, model: str, cache: Optional[LLMCache] = None,
+                 async_http_client_factory: Optional[Callable[[], httpx.AsyncClient]] = None) -> None:
         """
         Inicializa a conexão com a API.
 
         Args:
             api_key (str): Chave de API
             model (str): Modelo a ser usado
+            cache (LLMCache, optional): Cache de respostas consultado antes de cada requisição
+            async_http_client_factory (Callable[[], httpx.AsyncClient], optional): Função que
+                devolve o cliente HTTP assíncrono compartilhado; só é chamada no primeiro uso assíncrono
         """
         self.api_key = api_key
         self.model = model
+        self.cache = cache
+        self._async_http_client_factory = async_http_client_factory
+        self._async_client: Any = None
+
+    @property
+    def async_client(self) -> Any:
+        """
+        Cliente assíncrono do SDK, criado apenas na primeira requisição assíncrona.
+        """
+        if self._async_client is None:
+            http_client = None
+            if self._async_http_client_factory is not None:
+                http_client = self._async_http_client_factory()
+            self._async_client = self._create_async_client(http_client)
+        return self._async_client
+
+    @abstractmethod
+    def _create_async_client(self, http_client: Optional[httpx.AsyncClient]) -> Any:
+        """
+        Cria o cliente assíncrono do SDK do provedor.
+
+        Args:
+            http_client (httpx.AsyncClient, optional): Cliente HTTP assíncrono a ser usado pelo SDK
+
+        Returns:
+            Any: Cliente assíncrono do SDK
+        """
+        pass
+
+    def _cache_lookup(self, prompt: str) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Consulta o cache sem deixar que uma falha dele impeça a requisição.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Any]: Resposta em cache (ou None) e o embedding do prompt
+        """
+        try:
+            return self.cache.lookup(self.model, prompt)
+        except Exception as e:
+            logging.warning(f"Erro ao consultar o cache: {e}")
+            return None, None
 
     def send_request(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -73,17 +166,152 @@ class BaseAPIConnection(APIConnection):
         Returns:
             Dict[str, Any]: Resposta da API em formato de dicionário
         """
+        # Argumentos extras alteram a resposta, então só usamos o cache sem eles
+        use_cache = self.cache is not None and not kwargs
+        embedding = None
+        if use_cache:
+            cached, embedding = self._cache_lookup(prompt)
+            if cached is not None:
+                return cached
+
         try:
             completion = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 **kwargs
             )
-            return completion
         except Exception as e:
             print(f"Erro ao enviar requisição para a API: {str(e)}")
             return {}
 
+        if use_cache:
+            self.cache.set(self.model, prompt, completion, embedding)
+        return completion
+
+    def stream_request(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """
+        Envia uma requisição para a API com streaming, repassando os tokens conforme chegam.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+            **kwargs: Argumentos adicionais específicos da API
+
+        Yields:
+            str: Trechos do texto gerado, na ordem em que chegam
+        """
+        use_cache = self.cache is not None and not kwargs
+        embedding = None
+        if use_cache:
+            cached, embedding = self._cache_lookup(prompt)
+            if cached is not None:
+                yield self.get_response(cached)
+                return
+
+        chunks = []
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **kwargs
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+        except Exception as e:
+            print(f"Erro ao enviar requisição para a API: {str(e)}")
+            return
+
+        if use_cache and chunks:
+            self.cache.set(self.model, prompt, {
+                "choices": [{"message": {"role": "assistant", "content": "".join(chunks)}}]
+            }, embedding)
+
+    async def astream_request(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Envia uma requisição com streaming usando o cliente assíncrono. Como cada
+        trecho é aguardado no loop de eventos, um Ctrl+C cancela o streaming.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+            **kwargs: Argumentos adicionais específicos da API
+
+        Yields:
+            str: Trechos do texto gerado, na ordem em que chegam
+        """
+        use_cache = self.cache is not None and not kwargs
+        embedding = None
+        if use_cache:
+            cached, embedding = await asyncio.to_thread(self._cache_lookup, prompt)
+            if cached is not None:
+                yield self.get_response(cached)
+                return
+
+        chunks = []
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **kwargs
+            )
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+            finally:
+                # Libera a conexão também quando o streaming é cancelado
+                await stream.close()
+        except Exception as e:
+            print(f"Erro ao enviar requisição para a API: {str(e)}")
+            return
+
+        if use_cache and chunks:
+            await asyncio.to_thread(self.cache.set, self.model, prompt, {
+                "choices": [{"message": {"role": "assistant", "content": "".join(chunks)}}]
+            }, embedding)
+
+    async def asend_request(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Envia uma requisição para a API usando o cliente assíncrono.
+
+        Args:
+            prompt (str): O texto de entrada para o modelo
+            **kwargs: Argumentos adicionais específicos da API
+
+        Returns:
+            Dict[str, Any]: Resposta da API em formato de dicionário
+        """
+        use_cache = self.cache is not None and not kwargs
+        embedding = None
+        if use_cache:
+            # Consulta ao cache (inclusive o embedding) fora do loop de eventos
+            cached, embedding = await asyncio.to_thread(self._cache_lookup, prompt)
+            if cached is not None:
+                return cached
+
+        try:
+            completion = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            )
+        except Exception as e:
+            print(f"Erro ao enviar requisição para a API: {str(e)}")
+            return {}
+
+        if use_cache:
+            await asyncio.to_thread(self.cache.set, self.model, prompt, completion, embedding)
+        return completion
+
     def get_response(self, response: Dict[str, Any]) -> str:
         """
         Processa a resposta da API e extrai o conteúdo gerado.
@@ -95,8 +323,10 @@ class BaseAPIConnection(APIConnection):
             str: Texto processado da resposta
         """
         try:
+            if isinstance(response, dict):
+                return response["choices"][0]["message"]["content"]
             return response.choices[0].message.content
-        except AttributeError as e:
+        except (AttributeError, KeyError, IndexError) as e:
             print(f"Erro ao acessar atributos da resposta: {str(e)}")
             return ""
         except Exception as e:
@@ -109,16 +339,26 @@ class ChatGPTConnection(BaseAPIConnection):
     Implementação da conexão com a API do ChatGPT.
     """
 
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini") -> None:
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini",
+                 cache: Optional[LLMCache] = None,
+                 http_client: Optional[httpx.Client] = None,
+                 async_http_client_factory: Optional[Callable[[], httpx.AsyncClient]] = None) -> None:
         """
         Inicializa a conexão com a API do ChatGPT.
 
         Args:
             api_key (str): Chave de API do OpenAI
             model (str, optional): Modelo a ser usado. Defaults to "gpt-4o-mini"
+            cache (LLMCache, optional): Cache de respostas compartilhado
+            http_client (httpx.Client, optional): Cliente HTTP compartilhado para reaproveitar conexões
+            async_http_client_factory (Callable[[], httpx.AsyncClient], optional): Função que
+                devolve o cliente HTTP assíncrono compartilhado
         """
-        super().__init__(api_key, model)
-        self.client = OpenAI(api_key=api_key)
+        super().__init__(api_key, model, cache, async_http_client_factory)
+        self.client = OpenAI(api_key=api_key, http_client=http_client)
+
+    def _create_async_client(self, http_client: Optional[httpx.AsyncClient]) -> Any:
+        return AsyncOpenAI(api_key=self.api_key, http_client=http_client)
 
 
 class GroqConnection(BaseAPIConnection):
@@ -126,16 +366,26 @@ class GroqConnection(BaseAPIConnection):
     Implementação da conexão com a API do Groq.
     """
 
-    def __init__(self, api_key: str, model: str = "deepseek-r1-distill-llama-70b") -> None:
+    def __init__(self, api_key: str, model: str = "deepseek-r1-distill-llama-70b",
+                 cache: Optional[LLMCache] = None,
+                 http_client: Optional[httpx.Client] = None,
+                 async_http_client_factory: Optional[Callable[[], httpx.AsyncClient]] = None) -> None:
         """
         Inicializa a conexão com a API do Groq.
 
         Args:
             api_key (str): Chave de API do serviço Groq
             model (str, optional): Modelo a ser usado. Defaults to "llama-3.1-8b-instant"
+            cache (LLMCache, optional): Cache de respostas compartilhado
+            http_client (httpx.Client, optional): Cliente HTTP compartilhado para reaproveitar conexões
+            async_http_client_factory (Callable[[], httpx.AsyncClient], optional): Função que
+                devolve o cliente HTTP assíncrono compartilhado
         """
-        super().__init__(api_key, model)
-        self.client = Groq(api_key=api_key)
+        super().__init__(api_key, model, cache, async_http_client_factory)
+        self.client = Groq(api_key=api_key, http_client=http_client)
+
+    def _create_async_client(self, http_client: Optional[httpx.AsyncClient]) -> Any:
+        return AsyncGroq(api_key=self.api_key, http_client=http_client)
 
 
 class APIConnectionFactory:
@@ -143,8 +393,14 @@ class APIConnectionFactory:
     Factory para criar instâncias de conexões com APIs.
     """
 
-    @staticmethod
-    def create_connection(api_type: str, api_key: Optional[str] = None, **kwargs: Any) -> Optional[APIConnection]:
+    # Tipo de API -> (classe da conexão, variável de ambiente da chave, nome exibido)
+    _REGISTRY: Dict[str, Tuple[Type[BaseAPIConnection], str, str]] = {
+        "chatgpt": (ChatGPTConnection, "OPENAI_API_KEY", "ChatGPT"),
+        "groq": (GroqConnection, "GROQ_API_KEY", "Groq")
+    }
+
+    @classmethod
+    def create_connection(cls, api_type: str, api_key: Optional[str] = None, **kwargs: Any) -> Optional[APIConnection]:
         """
         Cria uma instância de conexão com API baseada no tipo especificado.
 
@@ -160,15 +416,12 @@ class APIConnectionFactory:
         Raises:
             ValueError: Se o tipo de API não for suportado ou se a chave API não for encontrada
         """
-        if api_type.lower() == "chatgpt":
-            api_key = api_key or os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise ValueError("API key não encontrada para ChatGPT. Verifique se a chave está configurada no .env")
-            return ChatGPTConnection(api_key, **kwargs)
-        elif api_type.lower() == "groq":
-            api_key = api_key or os.getenv("GROQ_API_KEY")
-            if not api_key:
-                raise ValueError("API key não encontrada para Groq. Verifique se a chave está configurada no .env")
-            return GroqConnection(api_key, **kwargs)
-        else:
+        entry = cls._REGISTRY.get(api_type.lower())
+        if entry is None:
             raise ValueError(f"Tipo de API não suportado: {api_type}")
+
+        connection_class, env_var, display_name = entry
+        api_key = api_key or os.getenv(env_var)
+        if not api_key:
+            raise ValueError(f"API key não encontrada para {display_name}. Verifique se a chave está configurada no .env")
+        return connection_class(api_key, **kwargs)
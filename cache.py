@@ -0,0 +1,269 @@
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import orjson
+
+
+class LLMCache:
+    """
+    Cache de respostas dos modelos de linguagem em dois níveis.
+
+    O primeiro nível usa uma chave exata (SHA-256 do modelo e do prompt). O
+    segundo compara o embedding do prompt com os prompts já armazenados e
+    reaproveita a resposta quando a similaridade do cosseno atinge o limiar.
+
+    Falhas do cache (embeddings ou persistência) nunca são propagadas: no pior
+    caso a resposta simplesmente não fica armazenada. Os métodos públicos podem
+    ser chamados de várias threads ao mesmo tempo.
+    """
+
+    def __init__(self,
+                 backend: Optional[str] = None,
+                 ttl: Optional[int] = 3600,
+                 max_entries: int = 256,
+                 similarity_threshold: float = 0.92,
+                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2") -> None:
+        """
+        Inicializa o cache.
+
+        Args:
+            backend (str, optional): Arquivo JSON Lines para persistir o cache. Se não
+                                     fornecido, o cache fica apenas em memória
+            ttl (int, optional): Tempo de vida das entradas em segundos. None desativa a expiração
+            max_entries (int): Número máximo de entradas mantidas (LRU)
+            similarity_threshold (float): Similaridade mínima para o nível semântico
+            embedding_model (str): Modelo do sentence-transformers usado nos embeddings
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._encoder: Any = None
+        self._semantic_enabled = True
+        self._lock = threading.Lock()
+        self._encoder_lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """
+        Gera a chave exata de uma entrada.
+
+        Args:
+            model (str): Nome do modelo
+            prompt (str): Texto enviado ao modelo
+
+        Returns:
+            str: Hash SHA-256 do par (modelo, prompt)
+        """
+        payload = json.dumps({"model": model, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, model: str, prompt: str) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Busca uma resposta em cache, primeiro pela chave exata e depois por similaridade.
+
+        O embedding do prompt só é calculado quando não há correspondência exata e
+        é devolvido para ser repassado a set(), evitando calculá-lo duas vezes.
+
+        Args:
+            model (str): Nome do modelo
+            prompt (str): Texto enviado ao modelo
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Any]: Resposta serializada (ou None) e o
+                embedding do prompt (ou None se não foi calculado)
+        """
+        key = self.make_key(model, prompt)
+        with self._lock:
+            self._purge_expired()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]["response"], None
+
+        # O embedding é calculado fora do lock para não serializar as consultas
+        embedding = self._embed(prompt)
+        with self._lock:
+            key = self._semantic_lookup(model, embedding)
+            if key is not None:
+                self._entries.move_to_end(key)
+                return self._entries[key]["response"], embedding
+        return None, embedding
+
+    def set(self, model: str, prompt: str, response: Any, embedding: Any = None) -> None:
+        """
+        Armazena a resposta de um modelo. Erros são registrados e ignorados.
+
+        Args:
+            model (str): Nome do modelo
+            prompt (str): Texto enviado ao modelo
+            response (Any): Objeto de resposta da API ou sua forma serializada
+            embedding (Any, optional): Embedding devolvido por lookup(); sem ele a
+                                       entrada só participa do nível exato
+        """
+        try:
+            if hasattr(response, "model_dump"):
+                response = response.model_dump()
+            if not response:
+                return
+
+            key = self.make_key(model, prompt)
+            entry = {
+                "model": model,
+                "prompt": prompt,
+                "response": response,
+                "created": time.time(),
+                "embedding": embedding
+            }
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._append(key, entry)
+        except Exception as e:
+            logging.warning(f"Erro ao armazenar resposta no cache: {e}")
+
+    def _semantic_lookup(self, model: str, query: Any) -> Optional[str]:
+        """
+        Procura a entrada do mesmo modelo com o prompt mais similar ao embedding informado.
+        """
+        if query is None:
+            return None
+        import numpy as np
+
+        keys = [key for key, entry in self._entries.items()
+                if entry["model"] == model and entry["embedding"] is not None]
+        if not keys:
+            return None
+
+        embeddings = np.stack([self._entries[key]["embedding"] for key in keys])
+        norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+        similarities = embeddings @ query / np.maximum(norms, 1e-12)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            return keys[best]
+        return None
+
+    def _embed(self, text: str) -> Any:
+        """
+        Calcula o embedding de um texto. Retorna None se o sentence-transformers
+        não estiver disponível ou falhar ao carregar, desativando o nível semântico.
+        """
+        if not self._semantic_enabled:
+            return None
+        try:
+            import numpy as np
+
+            with self._encoder_lock:
+                if self._encoder is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._encoder = SentenceTransformer(self.embedding_model)
+            return np.asarray(self._encoder.encode(text), dtype=np.float32)
+        except ImportError:
+            self._semantic_enabled = False
+        except Exception as e:
+            logging.warning(f"Nível semântico do cache desativado: {e}")
+            self._semantic_enabled = False
+        return None
+
+    def _purge_expired(self) -> None:
+        """
+        Remove as entradas cujo tempo de vida expirou.
+        """
+        if self.ttl is None:
+            return
+        limit = time.time() - self.ttl
+        expired = [key for key, entry in self._entries.items() if entry["created"] < limit]
+        for key in expired:
+            del self._entries[key]
+
+    def _append(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Acrescenta uma entrada ao final do arquivo de backend.
+        """
+        if not self.backend:
+            return
+        with open(self.backend, 'ab') as f:
+            f.write(orjson.dumps({"key": key, **entry},
+                                 option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+
+    def _load(self) -> None:
+        """
+        Carrega as entradas persistidas no arquivo de backend. Linhas posteriores
+        substituem as anteriores com a mesma chave e linhas corrompidas são ignoradas.
+        Se o arquivo acumulou entradas descartadas, ele é reescrito só com as válidas.
+        """
+        if not self.backend or not os.path.exists(self.backend):
+            return
+        lines = 0
+        has_embeddings = False
+        try:
+            with open(self.backend, 'rb') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = orjson.loads(line)
+                        key = entry.pop("key")
+                        if not self._is_valid_entry(key, entry):
+                            continue
+                        entry.setdefault("embedding", None)
+                    except (orjson.JSONDecodeError, AttributeError, KeyError, TypeError):
+                        continue
+                    has_embeddings = has_embeddings or entry.get("embedding") is not None
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+        except OSError as e:
+            logging.warning(f"Erro ao carregar o cache: {e}")
+            return
+
+        if has_embeddings:
+            # numpy só é importado quando há embeddings persistidos
+            import numpy as np
+
+            for entry in self._entries.values():
+                if entry["embedding"] is not None:
+                    try:
+                        entry["embedding"] = np.asarray(entry["embedding"], dtype=np.float32)
+                    except (TypeError, ValueError):
+                        entry["embedding"] = None
+
+        self._purge_expired()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if lines > len(self._entries):
+            self._compact()
+
+    @staticmethod
+    def _is_valid_entry(key: Any, entry: Dict[str, Any]) -> bool:
+        """
+        Verifica se uma linha carregada do backend tem todos os campos de uma entrada.
+        """
+        return (isinstance(key, str)
+                and isinstance(entry.get("model"), str)
+                and isinstance(entry.get("response"), dict)
+                and isinstance(entry.get("created"), (int, float))
+                and not isinstance(entry.get("created"), bool)
+                and (entry.get("embedding") is None or isinstance(entry["embedding"], list)))
+
+    def _compact(self) -> None:
+        """
+        Reescreve o arquivo de backend apenas com as entradas atuais.
+        """
+        temp = f"{self.backend}.tmp"
+        try:
+            with open(temp, 'wb') as f:
+                for key, entry in self._entries.items():
+                    f.write(orjson.dumps({"key": key, **entry},
+                                         option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+            os.replace(temp, self.backend)
+        except OSError as e:
+            logging.warning(f"Erro ao compactar o cache: {e}")
@@ -1,15 +1,57 @@
-from typing import Dict, Optional
-from api_connection import APIConnectionFactory
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import threading
+import httpx
+from api_connection import APIConnection, APIConnectionFactory
+from cache import LLMCache
 from commands import AskModelCommand, CommandInvoker
 from evaluation_strategy import ResponseEvaluator
 from observers import ResponseSubject, ConsoleObserver, FileObserver, LogObserver
-import os
 from dotenv import load_dotenv
 
 # Carregar as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 
+async def ainput(prompt: str) -> str:
+    """
+    Lê uma linha da entrada padrão sem bloquear o loop de eventos.
+
+    A leitura ocorre em uma thread daemon (e não no executor padrão do asyncio),
+    para que um Ctrl+C encerre o programa sem esperar a linha ser digitada.
+
+    Args:
+        prompt (str): Texto exibido antes da leitura
+
+    Returns:
+        str: Linha digitada
+
+    Raises:
+        EOFError: Se a entrada padrão terminar
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value) -> None:
+        if not future.done():
+            setter(value)
+
+    def read() -> None:
+        try:
+            value = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(deliver, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(deliver, future.set_result, value)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
 class CLI:
     """
     Interface de linha de comando para interação com os modelos.
@@ -27,12 +69,22 @@ class CLI:
         }
         self.evaluator = ResponseEvaluator()
         self.last_responses: Dict[str, str] = {}
+        self.cache = LLMCache("llm_cache.jsonl")
+
+        # Cliente HTTP compartilhado: as conexões TCP/TLS são reaproveitadas entre as perguntas
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+        )
+        # Cliente assíncrono compartilhado, criado só quando um caminho assíncrono é usado
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self.connections: Dict[str, APIConnection] = {}
 
         # Adicionar sujeito e observadores
         self.response_subject = ResponseSubject()
 
         # Adicionar diferentes tipos de observadores
-        self.response_subject.attach(ConsoleObserver())
+        self.console_observer = ConsoleObserver()
+        self.response_subject.attach(self.console_observer)
         self.response_subject.attach(FileObserver())
         self.response_subject.attach(LogObserver())
 
@@ -45,6 +97,7 @@ class CLI:
         print("2. Usar Groq")
         print("3. Comparar últimas respostas")
         print("4. Sair")
+        print("5. Perguntar ao ChatGPT e ao Groq simultaneamente")
 
     def compare_responses(self) -> None:
         """
@@ -66,73 +119,260 @@ class CLI:
             for key, value in result.items():
                 print(f"  {key}: {value}")
 
-    def run(self) -> None:
+    def get_async_http_client(self) -> httpx.AsyncClient:
+        """
+        Retorna o cliente HTTP assíncrono compartilhado pelos provedores, criando-o no primeiro uso.
+
+        Com o pacote h2 instalado o cliente usa HTTP/2, e várias requisições
+        simultâneas compartilham a mesma conexão; sem ele, usa HTTP/1.1.
+
+        Returns:
+            httpx.AsyncClient: Cliente HTTP assíncrono
+        """
+        if self._async_http_client is None:
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+            # Sem timeout explícito: os SDKs mantêm o timeout padrão deles
+            self._async_http_client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+        return self._async_http_client
+
+    def get_connection(self, model_name: str) -> APIConnection:
+        """
+        Retorna a conexão do modelo, criando-a apenas no primeiro uso.
+
+        Args:
+            model_name (str): Nome do modelo ("chatgpt" ou "groq")
+
+        Returns:
+            APIConnection: Conexão reutilizável com o modelo
+
+        Raises:
+            ValueError: Se a chave API do modelo não for encontrada
+        """
+        if model_name not in self.connections:
+            self.connections[model_name] = self.factory.create_connection(
+                model_name,
+                cache=self.cache,
+                http_client=self.http_client,
+                async_http_client_factory=self.get_async_http_client
+            )
+        return self.connections[model_name]
+
+    async def ask_all(self, question: str) -> Dict[str, str]:
+        """
+        Envia a mesma pergunta a todos os modelos em paralelo.
+
+        Args:
+            question (str): Pergunta a ser enviada
+
+        Returns:
+            Dict[str, str]: Respostas indexadas pelo nome do modelo
+        """
+        names = list(self.models.values())
+        connections = [self.get_connection(name) for name in names]
+        completions = await asyncio.gather(
+            *(connection.asend_request(question) for connection in connections)
+        )
+
+        answers: Dict[str, str] = {}
+        for name, connection, completion in zip(names, connections, completions):
+            answer = connection.get_response(completion)
+            answers[name] = answer
+            self.last_responses[name] = answer
+            self.response_subject.set_response(name, question, answer)
+        return answers
+
+    async def run_batch(self, prompts: Iterable[str], model: str,
+                        concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Envia várias perguntas a um modelo, mantendo até `concurrency` requisições em andamento.
+
+        Args:
+            prompts (Iterable[str]): Perguntas a serem enviadas
+            model (str): Nome do modelo ("chatgpt" ou "groq")
+            concurrency (int): Número máximo de requisições simultâneas
+
+        Returns:
+            List[Dict[str, Any]]: Um registro por pergunta, na mesma ordem, com as chaves
+                "question" e "response"; perguntas que falharam têm "response" None e "error"
+
+        Raises:
+            ValueError: Se a chave API do modelo não for encontrada
+        """
+        connection = self.get_connection(model)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def ask(prompt: str) -> Dict[str, Any]:
+            async with semaphore:
+                completion = await connection.asend_request(prompt)
+            if not completion:
+                return {
+                    "question": prompt,
+                    "response": None,
+                    "error": "Falha ao enviar requisição para a API"
+                }
+            answer = connection.get_response(completion)
+            self.response_subject.set_response(model, prompt, answer)
+            return {"question": prompt, "response": answer}
+
+        return list(await asyncio.gather(*(ask(prompt) for prompt in prompts)))
+
+    async def close(self) -> None:
+        """
+        Entrega as notificações pendentes e libera as conexões HTTP.
+        """
+        self.response_subject.flush()
+        self.http_client.close()
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose()
+
+    async def run(self) -> None:
         """
         Executa o loop principal da CLI.
         """
-        while True:
-            self.display_menu()
-            choice = input("Escolha uma opção: ")
+        try:
+            while True:
+                # Garante que as notificações da pergunta anterior saiam antes do menu
+                self.response_subject.flush()
+                self.display_menu()
+                choice = await ainput("Escolha uma opção: ")
 
-            if choice == "4":
-                print("Saindo...")
-                break
+                if choice == "4":
+                    print("Saindo...")
+                    break
 
-            if choice == "3":
-                self.compare_responses()
-                continue
+                if choice == "3":
+                    self.compare_responses()
+                    continue
 
-            if choice not in self.models:
-                print("Opção inválida!")
-                continue
+                if choice == "5":
+                    question = await ainput("Digite sua pergunta: ")
+                    try:
+                        await self.ask_all(question)
+                    except Exception as e:
+                        print(f"Erro: {e}")
+                    continue
 
-            # Obter a pergunta do usuário
-            question = input("Digite sua pergunta: ")
+                if choice not in self.models:
+                    print("Opção inválida!")
+                    continue
 
-            try:
-                # Obter as chaves de API das variáveis de ambiente
-                openai_api_key = os.getenv("OPENAI_API_KEY")
-                groq_api_key = os.getenv("GROQ_API_KEY")
+                # Obter a pergunta do usuário
+                question = await ainput("Digite sua pergunta: ")
 
-                if choice == "1" and not openai_api_key:
-                    raise ValueError("Chave de API do ChatGPT não encontrada nas variáveis de ambiente.")
-                if choice == "2" and not groq_api_key:
-                    raise ValueError("Chave de API do Groq não encontrada nas variáveis de ambiente.")
+                try:
+                    # Reutilizar a conexão com o modelo escolhido
+                    model_connection = self.get_connection(self.models[choice])
 
-                # Criar conexão com o modelo escolhido
-                api_key = openai_api_key if choice == "1" else groq_api_key
-                model_connection = self.factory.create_connection(self.models[choice], api_key)
+                    # Criar e executar o comando
+                    command = AskModelCommand(model_connection, question)
+                    self.invoker.set_command(command)
+                    response = await self.invoker.execute_command()
+                    self.last_responses[self.models[choice]] = response
 
-                # Criar e executar o comando
-                command = AskModelCommand(model_connection, question)
-                self.invoker.set_command(command)
-                self.invoker.execute_command()
+                    # Notificar observadores sobre a nova resposta
+                    self.response_subject.set_response(
+                        self.models[choice],
+                        question,
+                        response
+                    )
 
-                # Obter resposta e notificar observadores
-                response = model_connection.get_response(
-                    model_connection.send_request(question)
-                )
-                self.last_responses[self.models[choice]] = response
+                except Exception as e:
+                    print(f"Erro: {e}")
+        except EOFError:
+            print("\nSaindo...")
+        finally:
+            # Também em Ctrl+C ou fim da entrada, para não perder registros na fila
+            await self.close()
 
-                # Notificar observadores sobre a nova resposta
-                self.response_subject.set_response(
-                    self.models[choice],
-                    question,
-                    response
-                )
 
-            except Exception as e:
-                print(f"Erro: {e}")
+def positive_int(value: str) -> int:
+    """
+    Converte um argumento de linha de comando em inteiro maior ou igual a 1.
+
+    Args:
+        value (str): Valor informado na linha de comando
+
+    Returns:
+        int: Valor convertido
+
+    Raises:
+        argparse.ArgumentTypeError: Se o valor não for um inteiro positivo
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inteiro inválido: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"o valor deve ser pelo menos 1: {number}")
+    return number
 
 
 def main() -> None:
     """
     Função principal que inicia a CLI.
+
+    Sem argumentos abre o menu interativo; com --batch envia ao modelo todas as
+    perguntas do arquivo (uma por linha, "-" para a entrada padrão).
     """
+    parser = argparse.ArgumentParser(description="CLI para interação com modelos de IA")
+    parser.add_argument("--batch", metavar="ARQUIVO",
+                        help='arquivo com uma pergunta por linha ("-" para a entrada padrão)')
+    parser.add_argument("--model", choices=["chatgpt", "groq"], default="chatgpt",
+                        help="modelo usado no modo batch")
+    parser.add_argument("--concurrency", type=positive_int, default=8,
+                        help="número máximo de requisições simultâneas no modo batch")
+    args = parser.parse_args()
+
+    if args.batch is None:
+        cli = CLI()
+        try:
+            asyncio.run(cli.run())
+        except KeyboardInterrupt:
+            print("\nSaindo...")
+        return
+
+    try:
+        if args.batch == "-":
+            lines = sys.stdin.readlines()
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+    except OSError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+    prompts = [line.strip() for line in lines if line.strip()]
+
+    # No modo batch as respostas vão para a saída padrão, na ordem das perguntas
     cli = CLI()
-    cli.run()
+    cli.response_subject.detach(cli.console_observer)
+
+    async def run_batch() -> List[Dict[str, Any]]:
+        try:
+            return await cli.run_batch(prompts, args.model, args.concurrency)
+        finally:
+            await cli.close()
+
+    # Mensagens de diagnóstico vão para a saída de erro; a saída padrão fica
+    # reservada para os registros JSON
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            records = asyncio.run(run_batch())
+    except (ValueError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for record in records:
+        print(json.dumps(record, ensure_ascii=False))
+    if any("error" in record for record in records):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    load_dotenv()
     main()
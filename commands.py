@@ -9,9 +9,12 @@ class BaseCommand(ABC):
     """
 
     @abstractmethod
-    def execute(self) -> None:
+    async def execute(self) -> Any:
         """
         Executa o comando.
+
+        Returns:
+            Any: Resultado do comando
         """
         pass
 
@@ -31,14 +34,26 @@ class AskModelCommand(BaseCommand):
         """
         self.model_connection = model_connection
         self.question = question
+        self.answer: str = ""
+
+    async def execute(self) -> str:
+        """
+        Envia a pergunta ao modelo, exibindo a resposta à medida que é gerada.
 
-    def execute(self) -> None:
+        Returns:
+            str: Texto completo da resposta do modelo
+        """
+        chunks = []
         try:
-            response = self.model_connection.send_request(self.question)
-            answer = self.model_connection.get_response(response)
-            print(f"Resposta: {answer}")
+            print("Resposta: ", end="", flush=True)
+            async for delta in self.model_connection.astream_request(self.question):
+                print(delta, end="", flush=True)
+                chunks.append(delta)
+            print()
         except Exception as e:
-            print(f"Erro ao processar pergunta: {e}")
+            print(f"\nErro ao processar pergunta: {e}")
+        self.answer = "".join(chunks)
+        return self.answer
 
 
 class CommandInvoker:
@@ -61,9 +76,13 @@ class CommandInvoker:
         """
         self.command = command
 
-    def execute_command(self) -> None:
+    async def execute_command(self) -> Any:
         """
         Executa o comando atual.
+
+        Returns:
+            Any: Resultado do comando ou None se nenhum comando estiver definido
         """
         if self.command:
-            self.command.execute()
+            return await self.command.execute()
+        return None
@@ -1,16 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Union
-from difflib import SequenceMatcher
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from typing import List, Dict, Any, Tuple, Union
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import re
+from rapidfuzz import fuzz
 
-# Download recursos necessários do NLTK
-nltk.download('punkt')
-nltk.download('stopwords')
+_WORD_RE = re.compile(r"\b\w+\b", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide um texto em palavras minúsculas.
+
+    Args:
+        text (str): Texto a ser tokenizado
+
+    Returns:
+        List[str]: Lista de palavras
+    """
+    return _WORD_RE.findall(text.lower())
+
+
+def _ensure_nltk() -> None:
+    """
+    Baixa o corpus de stopwords do NLTK somente se ele ainda não estiver instalado.
+    """
+    import nltk
+
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+
+
+@lru_cache(maxsize=None)
+def _stop_words() -> frozenset:
+    """
+    Carrega as stopwords em português do NLTK apenas quando forem necessárias.
+    """
+    from nltk.corpus import stopwords
+
+    _ensure_nltk()
+    return frozenset(stopwords.words('portuguese'))
+
+
+def _analyze(tokens: List[str]) -> List[str]:
+    """
+    Filtra os tokens para o TF-IDF, mantendo o comportamento padrão do
+    TfidfVectorizer (palavras com 2+ caracteres) e removendo stopwords.
+    """
+    stop_words = _stop_words()
+    return [token for token in tokens if len(token) > 1 and token not in stop_words]
+
+
+@lru_cache(maxsize=None)
+def _get_vectorizer() -> Any:
+    """
+    Cria o TfidfVectorizer reaproveitado entre as comparações, importando o
+    scikit-learn apenas no primeiro uso. Ele recebe listas de tokens já prontas.
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(analyzer=_analyze, dtype=np.float32, norm='l2')
+
+
+def _row_dot(matrix: Any) -> float:
+    """
+    Calcula o produto escalar entre as duas linhas de uma matriz CSR
+    diretamente sobre os arrays internos, sem criar matrizes intermediárias.
+
+    Args:
+        matrix (Any): Matriz esparsa CSR com duas linhas
+
+    Returns:
+        float: Produto escalar entre as linhas
+    """
+    import numpy as np
+
+    indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+    row1 = slice(indptr[0], indptr[1])
+    row2 = slice(indptr[1], indptr[2])
+    _, pos1, pos2 = np.intersect1d(
+        indices[row1], indices[row2], assume_unique=True, return_indices=True
+    )
+    return float(np.dot(data[row1][pos1], data[row2][pos2]))
+
+
+def _digest(text: str) -> bytes:
+    """
+    Gera um hash curto de um texto para identificar respostas já comparadas.
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
 
 
 class EvaluationStrategy(ABC):
@@ -33,43 +115,80 @@ class EvaluationStrategy(ABC):
         pass
 
 
-class WordCountStrategy(EvaluationStrategy):
+class TokenEvaluationStrategy(EvaluationStrategy):
     """
-    Estratégia que compara respostas baseada em contagem de palavras.
+    Estratégia que trabalha sobre respostas já tokenizadas, permitindo
+    que a tokenização seja feita uma única vez para várias estratégias.
     """
 
     def evaluate(self, response1: str, response2: str) -> Dict[str, Any]:
+        """
+        Tokeniza as respostas e delega para evaluate_tokens.
+        """
+        return self.evaluate_tokens(tokenize(response1), tokenize(response2))
+
+    @abstractmethod
+    def evaluate_tokens(self, words1: List[str], words2: List[str]) -> Dict[str, Any]:
+        """
+        Avalia e compara duas respostas tokenizadas.
+
+        Args:
+            words1 (List[str]): Tokens da primeira resposta
+            words2 (List[str]): Tokens da segunda resposta
+
+        Returns:
+            Dict[str, Any]: Resultados da avaliação
+        """
+        pass
+
+
+class WordCountStrategy(TokenEvaluationStrategy):
+    """
+    Estratégia que compara respostas baseada em contagem de palavras.
+    """
+
+    def evaluate_tokens(self, words1: List[str], words2: List[str]) -> Dict[str, Any]:
         """
         Avalia respostas contando palavras e calculando estatísticas básicas.
         """
-        words1 = word_tokenize(response1.lower())
-        words2 = word_tokenize(response2.lower())
+        return self._statistics(len(words1), len(words2))
+
+    def evaluate(self, response1: str, response2: str) -> Dict[str, Any]:
+        """
+        Avalia respostas contando as palavras sem montar listas de tokens. O texto
+        é convertido para minúsculas como em tokenize(), para que a contagem seja a
+        mesma de evaluate_tokens (a conversão pode alterar a divisão em palavras).
+        """
+        n1 = sum(1 for _ in _WORD_RE.finditer(response1.lower()))
+        n2 = sum(1 for _ in _WORD_RE.finditer(response2.lower()))
+        return self._statistics(n1, n2)
 
+    @staticmethod
+    def _statistics(n1: int, n2: int) -> Dict[str, Any]:
+        """
+        Calcula as estatísticas a partir das contagens de palavras.
+        """
         return {
-            "words_response1": len(words1),
-            "words_response2": len(words2),
-            "difference": abs(len(words1) - len(words2)),
-            "ratio": len(words1) / len(words2) if len(words2) > 0 else float('inf')
+            "words_response1": n1,
+            "words_response2": n2,
+            "difference": abs(n1 - n2),
+            "ratio": n1 / n2 if n2 > 0 else float('inf')
         }
 
 
-class SemanticSimilarityStrategy(EvaluationStrategy):
+class SemanticSimilarityStrategy(TokenEvaluationStrategy):
     """
     Estratégia que compara respostas baseada em similaridade semântica.
     """
 
-    def evaluate(self, response1: str, response2: str) -> Dict[str, Any]:
+    def evaluate_tokens(self, words1: List[str], words2: List[str]) -> Dict[str, Any]:
         """
         Avalia respostas usando TF-IDF e similaridade do cosseno,
         removendo stopwords antes da análise.
         """
-        # Obtém stopwords em português
-        stop_words = set(stopwords.words('portuguese'))
-
-        # Configura o vectorizer para remover stopwords
-        vectorizer = TfidfVectorizer(stop_words=list(stopwords.words("portuguese")))
-        tfidf_matrix = vectorizer.fit_transform([response1, response2])
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        tfidf_matrix = _get_vectorizer().fit_transform([words1, words2])
+        # As linhas já são normalizadas (L2), então o cosseno é o produto escalar
+        similarity = _row_dot(tfidf_matrix.tocsr())
 
         return {
             "semantic_similarity": similarity,
@@ -84,9 +203,9 @@ class TextSimilarityStrategy(EvaluationStrategy):
 
     def evaluate(self, response1: str, response2: str) -> Dict[str, Any]:
         """
-        Avalia respostas usando o algoritmo de sequência.
+        Avalia respostas usando o algoritmo de sequência (Indel normalizado do RapidFuzz).
         """
-        similarity = SequenceMatcher(None, response1, response2).ratio()
+        similarity = fuzz.ratio(response1, response2) / 100.0
 
         return {
             "text_similarity": similarity,
@@ -108,6 +227,9 @@ class ResponseEvaluator:
             "semantic": SemanticSimilarityStrategy(),
             "text": TextSimilarityStrategy()
         }
+        # Resultados de evaluate_all indexados pelo hash das duas respostas (LRU)
+        self._results_cache: "OrderedDict[Tuple[bytes, bytes], Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self._results_cache_size = 32
 
     def evaluate_responses(self,
                            response1: str,
@@ -144,9 +266,23 @@ class ResponseEvaluator:
         Returns:
             Dict[str, Dict[str, Any]]: Resultados de todas as avaliações
         """
+        key = (_digest(response1), _digest(response2))
+        if key in self._results_cache:
+            self._results_cache.move_to_end(key)
+            return {name: dict(result) for name, result in self._results_cache[key].items()}
+
+        # Tokeniza uma única vez para todas as estratégias baseadas em tokens
+        words1 = tokenize(response1)
+        words2 = tokenize(response2)
+
         results = {}
-        for strategy_name in self.strategies:
-            results[strategy_name] = self.evaluate_responses(
-                response1, response2, strategy_name
-            )
-        return results
+        for strategy_name, strategy in self.strategies.items():
+            if isinstance(strategy, TokenEvaluationStrategy):
+                results[strategy_name] = strategy.evaluate_tokens(words1, words2)
+            else:
+                results[strategy_name] = strategy.evaluate(response1, response2)
+
+        self._results_cache[key] = results
+        if len(self._results_cache) > self._results_cache_size:
+            self._results_cache.popitem(last=False)
+        return {name: dict(result) for name, result in results.items()}
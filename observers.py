@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import Dict, Any, Set
 from datetime import datetime
-import json
+import hashlib
 import logging
+import os
+import orjson
+import queue
+import threading
 
 
 class Observer(ABC):
@@ -28,10 +32,15 @@ class ResponseSubject:
 
     def __init__(self) -> None:
         """
-        Inicializa o sujeito com uma lista vazia de observadores.
+        Inicializa o sujeito sem observadores e inicia a
+        thread que entrega as notificações em segundo plano.
         """
-        self._observers: List[Observer] = []
+        # Observadores indexados por id(), preservando a ordem de inserção
+        self._observers: Dict[int, Observer] = {}
         self._current_response: Dict[str, Any] = {}
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._drain, daemon=True)
+        self._worker.start()
 
     def attach(self, observer: Observer) -> None:
         """
@@ -40,8 +49,7 @@ class ResponseSubject:
         Args:
             observer (Observer): Observador a ser adicionado
         """
-        if observer not in self._observers:
-            self._observers.append(observer)
+        self._observers.setdefault(id(observer), observer)
 
     def detach(self, observer: Observer) -> None:
         """
@@ -50,14 +58,34 @@ class ResponseSubject:
         Args:
             observer (Observer): Observador a ser removido
         """
-        self._observers.remove(observer)
+        self._observers.pop(id(observer), None)
 
     def notify(self) -> None:
         """
-        Notifica todos os observadores sobre mudanças.
+        Enfileira a resposta atual para ser entregue aos observadores sem bloquear quem chamou.
         """
-        for observer in self._observers:
-            observer.update(self._current_response)
+        self._queue.put_nowait(self._current_response.copy())
+
+    def flush(self) -> None:
+        """
+        Aguarda até que todas as notificações pendentes tenham sido entregues.
+        """
+        self._queue.join()
+
+    def _drain(self) -> None:
+        """
+        Consome a fila de notificações, repassando cada resposta a todos os observadores.
+        """
+        while True:
+            response_data = self._queue.get()
+            try:
+                for observer in list(self._observers.values()):
+                    try:
+                        observer.update(response_data)
+                    except Exception:
+                        logging.exception(f"Erro ao notificar o observador {observer!r}")
+            finally:
+                self._queue.task_done()
 
     def set_response(self, model: str, question: str, response: str) -> None:
         """
@@ -68,9 +96,13 @@ class ResponseSubject:
             question (str): Pergunta feita ao modelo
             response (str): Resposta gerada
         """
+        # Perguntas repetidas compartilham o mesmo identificador
+        prompt_id = hashlib.blake2b(question.encode("utf-8"), digest_size=8).hexdigest()
+
         self._current_response = {
             "timestamp": datetime.now().isoformat(),
             "model": model,
+            "prompt_id": prompt_id,
             "question": question,
             "response": response
         }
@@ -96,35 +128,65 @@ class FileObserver(Observer):
     Observador que salva as respostas em um arquivo.
     """
 
-    def __init__(self, filename: str = "responses.json") -> None:
+    def __init__(self, filename: str = "responses.jsonl",
+                 prompts_filename: str = "prompts.jsonl") -> None:
         """
         Inicializa o observador de arquivo.
 
         Args:
-            filename (str): Nome do arquivo para salvar as respostas
+            filename (str): Nome do arquivo JSON Lines para salvar as respostas
+            prompts_filename (str): Nome do arquivo JSON Lines com o texto de cada pergunta,
+                                    gravado uma única vez por prompt_id
         """
         self.filename = filename
+        self.prompts_filename = prompts_filename
+        self._known_prompts = self._load_prompt_ids()
 
-    def update(self, response_data: Dict[str, Any]) -> None:
+    def _load_prompt_ids(self) -> Set[str]:
+        """
+        Lê os identificadores das perguntas já gravadas no arquivo de perguntas,
+        ignorando linhas corrompidas (por exemplo, uma gravação interrompida).
+        """
+        prompt_ids: Set[str] = set()
         try:
-            # Carregar respostas existentes
-            try:
-                with open(self.filename, 'r') as f:
-                    responses = json.load(f)
-            except FileNotFoundError:
-                responses = []
+            with open(self.prompts_filename, 'rb') as f:
+                for line in f:
+                    try:
+                        prompt_ids.add(orjson.loads(line)["prompt_id"])
+                    except (orjson.JSONDecodeError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return prompt_ids
 
-            # Adicionar nova resposta
-            responses.append(response_data)
-
-            # Salvar todas as respostas
-            with open(self.filename, 'w') as f:
-                json.dump(responses, f, indent=2)
+    def update(self, response_data: Dict[str, Any]) -> None:
+        try:
+            record = dict(response_data)
+            prompt_id = record.get("prompt_id")
+            if prompt_id is not None:
+                # O texto da pergunta fica só no arquivo de perguntas
+                question = record.pop("question", None)
+                if prompt_id not in self._known_prompts:
+                    with open(self.prompts_filename, 'ab') as f:
+                        f.write(orjson.dumps({"prompt_id": prompt_id, "question": question},
+                                             option=orjson.OPT_APPEND_NEWLINE))
+                    self._known_prompts.add(prompt_id)
+
+            # Cada resposta é uma linha JSON acrescentada ao final do arquivo
+            with open(self.filename, 'ab') as f:
+                f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
 
         except Exception as e:
             logging.error(f"Erro ao salvar resposta: {e}")
 
 
+# Logger dedicado às respostas, configurado uma única vez e isolado do logger raiz
+_response_logger = logging.getLogger("cli_ai.responses")
+_response_logger.setLevel(logging.INFO)
+_response_logger.propagate = False
+_LOG_FORMATTER = logging.Formatter('%(asctime)s - %(message)s')
+
+
 class LogObserver(Observer):
     """
     Observador que registra as respostas em um log.
@@ -137,15 +199,19 @@ class LogObserver(Observer):
         Args:
             log_file (str): Nome do arquivo de log
         """
-        logging.basicConfig(
-            filename=log_file,
-            level=logging.INFO,
-            format='%(asctime)s - %(message)s'
-        )
+        self._logger = _response_logger
+        path = os.path.abspath(log_file)
+        if not any(getattr(handler, "baseFilename", None) == path
+                   for handler in self._logger.handlers):
+            handler = logging.FileHandler(path, encoding="utf-8")
+            handler.setFormatter(_LOG_FORMATTER)
+            self._logger.addHandler(handler)
 
     def update(self, response_data: Dict[str, Any]) -> None:
-        logging.info(
-            f"Nova resposta do modelo {response_data['model']}: "
-            f"Pergunta: {response_data['question']} | "
-            f"Resposta: {response_data['response']}"
+        # Formatação com %s fica a cargo do logging e só ocorre se o registro for emitido
+        self._logger.info(
+            "Nova resposta do modelo %s: Pergunta: %s | Resposta: %s",
+            response_data['model'],
+            response_data['question'],
+            response_data['response']
         )